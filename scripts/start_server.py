@@ -9,7 +9,8 @@ import os
 # Add parent directory to path to import src modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database.init_db import initialize_db
+from src.database.init_db import initialize_db, analyze_db
+from src.database.migrate_embeddings import migrate_embeddings
 from src.config import DB_PATH
 
 
@@ -20,6 +21,10 @@ def main():
         initialize_db()
     else:
         print(f"✓ Database found at {DB_PATH}")
+        converted = migrate_embeddings()
+        if converted:
+            print(f"✓ Converted {converted} legacy embedding(s) to normalized float32 BLOBs")
+        analyze_db()
     
     print("\n" + "="*60)
     print("Starting MCP FastAPI Server on http://localhost:8001")
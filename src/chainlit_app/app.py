@@ -3,11 +3,23 @@ Chainlit chat interface with RAG support
 """
 import chainlit as cl
 from src.config import MCP_SERVER_URL
-from src.chainlit_app.llm_service import get_completion_with_tools, get_streaming_completion
-from src.chainlit_app.ui_helpers import parse_sources_from_response, create_source_elements, format_sources_message
+from src.chainlit_app.llm_service import get_streaming_completion
+from src.chainlit_app.ui_helpers import (
+    STEP_OUTPUT_LENGTH,
+    parse_sources_from_response,
+    build_sources_ui,
+    strip_source_contents,
+    make_preview,
+    tool_status_label
+)
 import httpx
 import json
 
+# Shared HTTP client so tool calls reuse pooled connections to the MCP server.
+# HTTP/2 lets concurrent tool calls multiplex over a single connection when the
+# server (or a proxy in front of it) negotiates h2; otherwise it uses HTTP/1.1.
+http_client = httpx.AsyncClient(http2=True, timeout=30.0)
+
 
 @cl.on_chat_start
 async def start():
@@ -20,22 +32,69 @@ async def start():
 
 async def call_mcp_tool(tool_name: str, arguments: dict) -> str:
     """Call an MCP tool on the FastAPI backend"""
-    async with httpx.AsyncClient() as http_client:
-        try:
-            response = await http_client.post(
-                f"{MCP_SERVER_URL}/mcp/tools/call",
-                json={"name": tool_name, "arguments": arguments},
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            if result.get("isError", False):
-                return f"Error calling tool: {result['content'][0]['text']}"
-            
-            return result["content"][0]["text"]
-        except Exception as e:
-            return f"Error communicating with MCP server: {str(e)}"
+    try:
+        response = await http_client.post(
+            f"{MCP_SERVER_URL}/mcp/tools/call",
+            json={"name": tool_name, "arguments": arguments}
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        if result.get("isError", False):
+            return f"Error calling tool: {result['content'][0]['text']}"
+        
+        return result["content"][0]["text"]
+    except Exception as e:
+        return f"Error communicating with MCP server: {str(e)}"
+
+
+async def stream_assistant_reply(stream) -> tuple[str, list]:
+    """
+    Stream assistant content tokens to the UI and collect any tool calls
+    
+    Args:
+        stream: Streaming completion returned by get_streaming_completion
+        
+    Returns:
+        Tuple of (full_response, tool_calls)
+        - full_response: Concatenated assistant content
+        - tool_calls: Tool calls in the message format expected by the API
+    """
+    msg = None
+    full_response = ""
+    tool_calls = {}
+    
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        
+        if delta.content:
+            # Only create the message once there is content to show
+            if msg is None:
+                msg = cl.Message(content="")
+            full_response += delta.content
+            await msg.stream_token(delta.content)
+        
+        # Tool calls arrive in fragments keyed by their index
+        for tc in delta.tool_calls or []:
+            call = tool_calls.setdefault(tc.index, {
+                "id": "",
+                "type": "function",
+                "function": {"name": "", "arguments": ""}
+            })
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function:
+                if tc.function.name:
+                    call["function"]["name"] += tc.function.name
+                if tc.function.arguments:
+                    call["function"]["arguments"] += tc.function.arguments
+    
+    if msg is not None:
+        await msg.send()
+    
+    return full_response, [tool_calls[index] for index in sorted(tool_calls)]
 
 
 @cl.on_message
@@ -48,64 +107,50 @@ async def main(message: cl.Message):
     # Add user message to history
     messages.append({"role": "user", "content": message.content})
     
-    # Get completion with function calling enabled
-    response_message = get_completion_with_tools(messages)
-    tool_calls = response_message.tool_calls
+    # Stream the first completion with function calling enabled, so turns
+    # without tool calls are answered by this single request
+    stream = get_streaming_completion(messages, use_tools=True)
+    full_response, tool_calls = await stream_assistant_reply(stream)
     
     # Handle tool calls if any
     if tool_calls:
         # Add assistant's tool call to messages
         messages.append({
             "role": "assistant",
-            "content": response_message.content,
-            "tool_calls": [
-                {
-                    "id": tc.id,
-                    "type": "function",
-                    "function": {
-                        "name": tc.function.name,
-                        "arguments": tc.function.arguments
-                    }
-                }
-                for tc in tool_calls
-            ]
+            "content": full_response or None,
+            "tool_calls": tool_calls
         })
         
         # Execute each tool call
         sources_elements = []  # Store source elements for display
         
         for tool_call in tool_calls:
-            function_name = tool_call.function.name
-            function_args = json.loads(tool_call.function.arguments)
-            
-            # Show user that we're querying (only for search tools)
-            if function_name == "search_knowledge_base":
-                await cl.Message(
-                    content=f"🔍 Searching knowledge base for: {function_args.get('query', 'information')}..."
-                ).send()
-            elif function_name == "search_specific_documents":
-                await cl.Message(
-                    content=f"🔍 Searching specific documents for: {function_args.get('query', 'information')}..."
-                ).send()
-            elif function_name == "get_available_sources":
-                await cl.Message(
-                    content="📚 Checking available documents in knowledge base..."
-                ).send()
+            function_name = tool_call["function"]["name"]
+            function_args = json.loads(tool_call["function"]["arguments"])
             
-            # Call the MCP tool
-            function_response = await call_mcp_tool(function_name, function_args)
+            # Show the tool call as a step that updates in place instead of a separate message
+            async with cl.Step(name=tool_status_label(function_name, function_args), type="tool") as step:
+                step.input = tool_call["function"]["arguments"]
+                
+                # Call the MCP tool
+                function_response = await call_mcp_tool(function_name, function_args)
+                step.output = make_preview(function_response, STEP_OUTPUT_LENGTH)
             
             # Only show sources UI for search tools, not for get_available_sources
+            tool_content = function_response
             if function_name in ["search_knowledge_base", "search_specific_documents"]:
                 # Parse sources from response and create display elements
                 text_part, sources = parse_sources_from_response(function_response)
                 
                 if sources:
-                    # Create source elements for sidebar
-                    sources_elements.extend(create_source_elements(sources))
+                    # The LLM already gets each content in the text part
+                    tool_content = strip_source_contents(text_part, sources)
+                    
+                    # Create source elements for sidebar and the preview message together
+                    new_elements, sources_text = build_sources_ui(sources)
+                    sources_elements.extend(new_elements)
                     
                     # Display sources with previews
-                    sources_text = format_sources_message(sources)
                     await cl.Message(
                         content=sources_text,
                         elements=sources_elements
@@ -114,43 +159,17 @@ async def main(message: cl.Message):
             # Add tool response to messages
             messages.append({
                 "role": "tool",
-                "tool_call_id": tool_call.id,
+                "tool_call_id": tool_call["id"],
                 "name": function_name,
-                "content": function_response
+                "content": tool_content
             })
         
-        # Get streaming response with tool results
-        msg = cl.Message(content="")
+        # Get streaming response with tool results (no tool schema needed)
         stream = get_streaming_completion(messages)
-        
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                await msg.stream_token(content)
-        
-        await msg.send()
-        
-        # Add assistant response to history
-        messages.append({"role": "assistant", "content": full_response})
-    else:
-        # No tool calls, just stream the response
-        msg = cl.Message(content="")
-        stream = get_streaming_completion(messages)
-        
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                await msg.stream_token(content)
-        
-        await msg.send()
-        
-        # Add assistant response to history
-        messages.append({"role": "assistant", "content": full_response})
+        full_response, _ = await stream_assistant_reply(stream)
+    
+    # Add assistant response to history
+    messages.append({"role": "assistant", "content": full_response})
     
     # Update session with new messages
     cl.user_session.set("messages", messages)
-
@@ -105,41 +105,25 @@ TOOLS = [
 ]
 
 
-def get_completion_with_tools(messages: list, model: str = "gpt-4-turbo"):
-    """
-    Get a completion from OpenAI with function calling enabled
-    
-    Args:
-        messages: List of conversation messages
-        model: OpenAI model to use
-        
-    Returns:
-        The response message from OpenAI
-    """
-    response = client.chat.completions.create(
-        model=model,
-        messages=[SYSTEM_MESSAGE] + messages,
-        tools=TOOLS,
-        tool_choice="auto"
-    )
-    return response.choices[0].message
-
-
-def get_streaming_completion(messages: list, model: str = "gpt-4-turbo"):
+def get_streaming_completion(messages: list, model: str = "gpt-4-turbo", use_tools: bool = False):
     """
     Get a streaming completion from OpenAI
     
     Args:
         messages: List of conversation messages
         model: OpenAI model to use
+        use_tools: Whether to send the tool schema and let the model call tools
         
     Returns:
         A streaming response object
     """
+    # Only send the tool schema when the model may actually call a tool
+    tool_kwargs = {"tools": TOOLS, "tool_choice": "auto"} if use_tools else {}
+    
     stream = client.chat.completions.create(
         model=model,
         messages=[SYSTEM_MESSAGE] + messages,
-        stream=True
+        stream=True,
+        **tool_kwargs
     )
     return stream
-
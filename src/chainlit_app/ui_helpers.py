@@ -4,6 +4,53 @@ UI helper functions for formatting and displaying sources
 import json
 import chainlit as cl
 
+# Marker separating the human-readable tool output from its JSON payload
+SOURCES_SENTINEL = "---SOURCES_JSON---"
+
+# Maximum number of characters shown in a source preview
+PREVIEW_LENGTH = 100
+
+# Maximum number of characters of a tool response shown in its step
+STEP_OUTPUT_LENGTH = 500
+
+
+def make_preview(content: str, length: int = PREVIEW_LENGTH) -> str:
+    """
+    Truncate content to a short preview, slicing only when needed
+    
+    Args:
+        content: Full source content
+        length: Maximum number of characters to keep
+        
+    Returns:
+        The content itself if short enough, otherwise its first
+        length characters followed by an ellipsis
+    """
+    if len(content) <= length:
+        return content
+    return content[:length] + "..."
+
+
+def tool_status_label(function_name: str, function_args: dict) -> str:
+    """
+    Build the status label shown while a tool call is running
+    
+    Args:
+        function_name: Name of the tool being called
+        function_args: Arguments passed to the tool
+        
+    Returns:
+        Human-readable label for the tool step
+    """
+    query = function_args.get('query', 'information')
+    if function_name == "search_knowledge_base":
+        return f"🔍 Searching knowledge base for: {query}"
+    if function_name == "search_specific_documents":
+        return f"🔍 Searching specific documents for: {query}"
+    if function_name == "get_available_sources":
+        return "📚 Checking available documents in knowledge base"
+    return function_name
+
 
 def parse_sources_from_response(response: str) -> tuple[str, list]:
     """
@@ -15,34 +62,63 @@ def parse_sources_from_response(response: str) -> tuple[str, list]:
     Returns:
         Tuple of (text_part, sources_list)
     """
-    if "---SOURCES_JSON---" not in response:
+    # The JSON payload is appended last, so search from the end and slice once
+    idx = response.rfind(SOURCES_SENTINEL)
+    if idx == -1:
         return response, []
     
-    text_part, json_part = response.split("---SOURCES_JSON---", 1)
     try:
-        sources = json.loads(json_part.strip())
-        return text_part, sources
+        sources = json.loads(response[idx + len(SOURCES_SENTINEL):])
+        return response[:idx], sources
     except json.JSONDecodeError:
         return response, []
 
 
-def create_source_elements(sources: list) -> list:
+def strip_source_contents(text_part: str, sources: list) -> str:
+    """
+    Rebuild a search tool response without the chunk contents in its JSON
+    
+    The contents are already in the human-readable part, so the copy in the
+    JSON payload only doubles the tokens sent to the LLM.
+    
+    Args:
+        text_part: Human-readable part of the tool response
+        sources: Sources parsed from the tool response
+        
+    Returns:
+        The tool response with a JSON payload of ids, metadata and similarities
+    """
+    compact_sources = [
+        {key: value for key, value in source.items() if key != 'content'}
+        for source in sources
+    ]
+    return f"{text_part}{SOURCES_SENTINEL}\n{json.dumps(compact_sources)}"
+
+
+def build_sources_ui(sources: list) -> tuple[list, str]:
     """
-    Create Chainlit Text elements for each source
+    Build the sidebar elements and the sources message in a single pass
     
     Args:
         sources: List of source dictionaries
         
     Returns:
-        List of Chainlit Text elements
+        Tuple of (elements, sources_text)
+        - elements: List of Chainlit Text elements, one per source
+        - sources_text: Formatted markdown string with previews
     """
+    if not sources:
+        return [], ""
+    
     elements = []
+    parts = ["📚 **Sources Retrieved:**\n\n"]
     
     for i, source in enumerate(sources, 1):
-        title = source.get('metadata', {}).get('title', 'Untitled')
+        metadata = source.get('metadata', {})
+        title = metadata.get('title', 'Untitled')
+        chunk_number = metadata.get('chunk_number')
         similarity = source.get('similarity', 0)
         content = source.get('content', '')
-        chunk_number = source.get('metadata', {}).get('chunk_number')
         
         # Format content with metadata for better display
         formatted_content = f"Title: {title}\n"
@@ -54,39 +130,11 @@ def create_source_elements(sources: list) -> list:
         formatted_content += content
         
         # Create a text element with the full content
-        source_element = cl.Text(
+        elements.append(cl.Text(
             name=f"Source {i}: {title}",
             content=formatted_content,
             display="side"
-        )
-        elements.append(source_element)
-    
-    return elements
-
-
-def format_sources_message(sources: list) -> str:
-    """
-    Format sources into a readable message with previews
-    
-    Args:
-        sources: List of source dictionaries
-        
-    Returns:
-        Formatted markdown string
-    """
-    if not sources:
-        return ""
-    
-    sources_text = "📚 **Sources Retrieved:**\n\n"
-    
-    for i, source in enumerate(sources, 1):
-        title = source.get('metadata', {}).get('title', 'Untitled')
-        similarity = source.get('similarity', 0)
-        content = source.get('content', '')
-        chunk_number = source.get('metadata', {}).get('chunk_number')
-        
-        # Create preview
-        preview = content[:100] + "..." if len(content) > 100 else content
+        ))
         
         # Build source header with optional chunk info
         source_header = f"**Source {i}**: {title}"
@@ -94,9 +142,8 @@ def format_sources_message(sources: list) -> str:
             source_header += f" (Chunk {chunk_number})"
         source_header += f" — Relevance: {similarity:.0%}\n"
         
-        sources_text += source_header
-        sources_text += f"*Preview*: {preview}\n"
-        sources_text += f"👉 *Click 'Source {i}: {title}' in the sidebar to view full text*\n\n"
+        parts.append(source_header)
+        parts.append(f"*Preview*: {make_preview(content)}\n")
+        parts.append(f"👉 *Click 'Source {i}: {title}' in the sidebar to view full text*\n\n")
     
-    return sources_text
-
+    return elements, "".join(parts)
@@ -13,6 +13,16 @@ if not OPENAI_API_KEY:
         "Please create a .env file with your API key."
     )
 
+# Embedding Configuration
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Length of the embedding vectors requested from the API. Unset means the
+# model's native size; only the text-embedding-3 models accept a smaller one.
+# Changing the dimension (or the model) on an existing database makes every
+# stored chunk fail the search snapshot's dimension check, so re-upload the
+# documents afterwards.
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM")) if os.getenv("EMBEDDING_DIM") else None
+
 # Server Configuration
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8001")
 
@@ -5,10 +5,14 @@ from src.database.database import get_session, get_engine
 from src.database.operations import (
     get_document_by_id,
     get_document_by_title,
+    check_title_available,
     create_document,
     create_chunk,
+    create_chunks_bulk,
     update_document_chunk_count,
-    get_active_chunks_with_documents,
+    count_active_chunks,
+    iter_active_chunk_embeddings,
+    get_chunks_with_documents_by_ids,
     get_all_documents,
     toggle_document_active,
     delete_document
@@ -25,10 +29,14 @@ __all__ = [
     # Operations
     "get_document_by_id",
     "get_document_by_title",
+    "check_title_available",
     "create_document",
     "create_chunk",
+    "create_chunks_bulk",
     "update_document_chunk_count",
-    "get_active_chunks_with_documents",
+    "count_active_chunks",
+    "iter_active_chunk_embeddings",
+    "get_chunks_with_documents_by_ids",
     "get_all_documents",
     "toggle_document_active",
     "delete_document",
@@ -2,17 +2,40 @@
 Database connection and session management
 """
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from src.config import DB_PATH
 
-# Create engine (SQLite)
+# Create engine (SQLite) with a pool of reusable connections, so sessions
+# don't reopen the database file (and rewarm its page cache) on every request
 engine = create_engine(
     f"sqlite:///{DB_PATH}",
     echo=False,  # Set to True for SQL debugging
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    poolclass=QueuePool,
+    pool_size=8,
+    max_overflow=16
 )
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Configure each new SQLite connection
+    
+    WAL lets reads proceed while a write is in progress and needs a single
+    fsync per commit; mmap and a larger page cache keep reads in memory.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    cursor.close()
+
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
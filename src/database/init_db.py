@@ -3,6 +3,7 @@ Database initialization script
 Creates the necessary tables for the RAG knowledge base using SQLAlchemy
 """
 import os
+from sqlalchemy import text
 from src.config import DB_PATH
 from src.database.models import Base
 from src.database.database import get_engine
@@ -17,9 +18,18 @@ def initialize_db():
     # Create all tables
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    analyze_db()
     
     print(f"✓ Database initialized at: {DB_PATH}")
 
 
+def analyze_db():
+    """Refresh the query planner statistics for the tables and indexes"""
+    # Journal mode and the other pragmas are set per connection in database.py
+    with get_engine().connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+
 if __name__ == "__main__":
     initialize_db()
@@ -0,0 +1,54 @@
+"""
+Embedding storage migration
+Brings stored chunk embeddings up to the current format: L2-normalized
+float32 BLOBs (legacy rows may be JSON text or unnormalized BLOBs)
+"""
+import json
+import numpy as np
+from sqlalchemy import text
+
+from src.database.database import get_session
+from src.database.operations import encode_embedding
+
+# Stored vectors whose norm deviates more than this from 1 get re-normalized
+NORM_TOLERANCE = 1e-3
+
+
+def migrate_embeddings() -> int:
+    """
+    Re-encode legacy embeddings as normalized float32 BLOBs
+    
+    Safe to run repeatedly: rows already in the current format are left untouched.
+    
+    Returns:
+        The number of chunks that were converted
+    """
+    converted = 0
+    
+    with get_session() as session:
+        rows = session.execute(
+            text("SELECT id, embedding, typeof(embedding) FROM chunks")
+        ).all()
+        
+        for chunk_id, embedding, storage_class in rows:
+            if storage_class == "text":
+                vector = json.loads(embedding)
+            else:
+                vector = np.frombuffer(embedding, dtype=np.float32)
+                if abs(float(np.linalg.norm(vector)) - 1.0) <= NORM_TOLERANCE:
+                    continue
+            
+            session.execute(
+                text("UPDATE chunks SET embedding = :embedding WHERE id = :id"),
+                {"embedding": encode_embedding(vector), "id": chunk_id}
+            )
+            converted += 1
+        
+        session.commit()
+    
+    return converted
+
+
+if __name__ == "__main__":
+    converted = migrate_embeddings()
+    print(f"✓ Converted {converted} embedding(s) to normalized float32 BLOBs")
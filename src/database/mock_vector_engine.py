@@ -7,7 +7,11 @@ brute-force cosine similarity search, which is inefficient but simple for demos.
 """
 import numpy as np
 import logging
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from src.database.operations import count_active_chunks, iter_active_chunk_embeddings, get_corpus_version
 
 logger = logging.getLogger(__name__)
 
@@ -23,77 +27,244 @@ def cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     Returns:
         Cosine similarity score between -1 and 1
     """
-    vec1 = np.array(vec1)
-    vec2 = np.array(vec2)
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
+    return float(np.dot(a, b) / np.sqrt(np.vdot(a, a) * np.vdot(b, b) + 1e-30))
 
 
-def vector_search(
-    query_embedding: List[float],
-    chunks_data: List[Dict[str, Any]],
-    top_k: int = 3
-) -> List[Dict[str, Any]]:
+def cosine_scores(matrix: np.ndarray, query: np.ndarray, rows_normalized: bool = False) -> np.ndarray:
     """
-    Perform vector similarity search on chunks.
+    Calculate cosine similarity between a query and every row of a matrix.
+    
+    The query is L2-normalized and scored against all rows with one
+    matrix-vector product on a contiguous float32 buffer, which NumPy hands
+    to the BLAS SIMD kernels. This is the single scoring call site for
+    CorpusSnapshot.search.
+    
+    Args:
+        matrix: (N, D) array of chunk embeddings
+        query: (D,) query embedding
+        rows_normalized: Whether the rows are already unit length, in which
+            case the score is a plain dot product
+        
+    Returns:
+        (N,) float32 array of cosine similarity scores
+    """
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if not rows_normalized:
+        matrix = matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12)
+    query = np.asarray(query, dtype=np.float32)
+    query = query / (np.linalg.norm(query) + 1e-12)
+    return matrix @ query
+
+
+def _top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Select the indices of the top_k highest scores, highest first.
+    
+    Uses a partial sort so only the selected scores are fully ordered.
     
-    This is a naive implementation that:
-    1. Loads all embeddings into memory
-    2. Calculates cosine similarity with the query for each chunk
-    3. Sorts by similarity and returns top_k results
+    Args:
+        scores: (N,) array of similarity scores (N >= 1)
+        top_k: Number of indices to return (at least 1)
+        
+    Returns:
+        Array of at most top_k indices into scores
+    """
+    n = scores.shape[0]
+    k = min(top_k, n)
+    # Partition on the ascending order so no negated copy of all N scores is made
+    top_indices = np.argpartition(scores, n - k)[n - k:]
+    return top_indices[np.argsort(scores[top_indices])[::-1]]
+
+
+def build_result(chunk_data: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+    """
+    Build a search result dict for a single chunk
     
     Args:
-        query_embedding: Embedding vector for the search query
-        chunks_data: List of chunk dictionaries with 'embedding' and metadata
-        top_k: Number of top results to return
+        chunk_data: Chunk dictionary with content and document metadata
+        similarity: Cosine similarity score for the chunk
         
     Returns:
-        List of results sorted by similarity (highest first), each containing:
-        - id: chunk ID
-        - content: chunk text
-        - metadata: document metadata (title, page numbers, etc.)
-        - similarity: cosine similarity score
+        Result dictionary with id, content, metadata and similarity
+    """
+    return {
+        "id": chunk_data["chunk_id"],
+        "content": chunk_data["content"],
+        "metadata": {
+            "title": chunk_data["title"],
+            "description": chunk_data["description"],
+            "source_type": chunk_data["source_type"],
+            "start_page": chunk_data["start_page"],
+            "end_page": chunk_data["end_page"],
+            "chunk_number": chunk_data["chunk_number"],
+            "total_chunks": chunk_data["total_chunks"],
+            "unit_name": chunk_data["unit_name"],
+            "document_id": chunk_data["document_id"]
+        },
+        "similarity": float(similarity)
+    }
+
+
+class CorpusSnapshot:
+    """
+    In-memory snapshot of the embeddings of all active chunks.
+    
+    Embeddings are stacked into contiguous float32 matrices, one per embedding
+    dimension, alongside parallel arrays of chunk and document IDs, with rows
+    grouped by document so searches within documents only touch their rows. Embeddings
+    must be unit length, as stored by create_chunk, so each score is a plain
+    dot product.
     """
-    results = []
     
-    for chunk_data in chunks_data:
-        try:
-            # Build metadata dict
-            metadata = {
-                "title": chunk_data["title"],
-                "description": chunk_data["description"],
-                "source_type": chunk_data["source_type"],
-                "start_page": chunk_data["start_page"],
-                "end_page": chunk_data["end_page"],
-                "chunk_number": chunk_data["chunk_number"],
-                "total_chunks": chunk_data["total_chunks"],
-                "unit_name": chunk_data["unit_name"],
-                "document_id": chunk_data["document_id"]
-            }
+    def __init__(self, chunk_embeddings: Iterable[Tuple[int, int, np.ndarray]], size_hint: int = 0):
+        """
+        Args:
+            chunk_embeddings: Iterable of (chunk_id, document_id, embedding) tuples
+            size_hint: Expected number of rows, used to preallocate the matrices
+        """
+        # Copy each embedding straight into a preallocated matrix for its
+        # dimension, instead of collecting rows and stacking them afterwards
+        buffers = {}
+        size = 0
+        for chunk_id, document_id, embedding in chunk_embeddings:
+            dimension = len(embedding)
+            if dimension not in buffers:
+                capacity = max(size_hint, 1)
+                buffers[dimension] = [
+                    np.empty(capacity, dtype=np.int64),
+                    np.empty(capacity, dtype=np.int64),
+                    np.empty((capacity, dimension), dtype=np.float32),
+                    0
+                ]
+            buffer = buffers[dimension]
+            row = buffer[3]
+            if row == len(buffer[0]):
+                # More rows than expected (e.g. a commit landed after the count)
+                buffer[:3] = [np.concatenate([array, np.empty_like(array)]) for array in buffer[:3]]
+            buffer[0][row] = chunk_id
+            buffer[1][row] = document_id
+            buffer[2][row] = embedding
+            buffer[3] = row + 1
+            size += 1
+        
+        self.size = size
+        self._groups = {}
+        for dimension, (chunk_ids, doc_ids, matrix, rows) in buffers.items():
+            chunk_ids, doc_ids, matrix = chunk_ids[:rows], doc_ids[:rows], matrix[:rows]
             
-            embedding = chunk_data["embedding"]
+            # Keep rows ordered by document so each document's chunks are one
+            # contiguous block (rows normally arrive in this order already)
+            if rows > 1 and np.any(doc_ids[1:] < doc_ids[:-1]):
+                order = np.argsort(doc_ids, kind="stable")
+                chunk_ids, doc_ids, matrix = chunk_ids[order], doc_ids[order], matrix[order]
+            elif rows < len(buffers[dimension][0]):
+                chunk_ids, doc_ids, matrix = chunk_ids.copy(), doc_ids.copy(), matrix.copy()
             
-            # Check embedding dimensions
-            if len(embedding) != len(query_embedding):
-                logger.error(
-                    f"Dimension mismatch for chunk {chunk_data['chunk_id']} "
-                    f"('{chunk_data['title']}'): "
-                    f"query={len(query_embedding)}, chunk={len(embedding)}"
-                )
-                continue
+            self._groups[dimension] = (chunk_ids, doc_ids, matrix)
+    
+    @staticmethod
+    def _document_rows(doc_ids: np.ndarray, document_ids: List[int]) -> List[Tuple[int, int]]:
+        """Find the (start, stop) row range of each requested document in a group"""
+        wanted = np.unique(np.asarray(document_ids, dtype=np.int64))
+        starts = np.searchsorted(doc_ids, wanted, side="left")
+        stops = np.searchsorted(doc_ids, wanted, side="right")
+        return [(start, stop) for start, stop in zip(starts.tolist(), stops.tolist()) if stop > start]
+    
+    def count(self, document_ids: Optional[List[int]] = None) -> int:
+        """
+        Count the chunks in the snapshot
+        
+        Args:
+            document_ids: Optional list of document IDs to restrict the count to
             
-            # Calculate similarity
-            similarity = cosine_similarity(query_embedding, embedding)
-            results.append({
-                "id": chunk_data["chunk_id"],
-                "content": chunk_data["content"],
-                "metadata": metadata,
-                "similarity": similarity
-            })
-        except Exception as e:
-            logger.error(f"Error processing chunk {chunk_data.get('chunk_id', 'unknown')}: {str(e)}")
-            continue
+        Returns:
+            Number of chunks (from the given documents, if any)
+        """
+        if document_ids is None:
+            return self.size
+        return sum(
+            stop - start
+            for _, doc_ids, _ in self._groups.values()
+            for start, stop in self._document_rows(doc_ids, document_ids)
+        )
     
-    # Sort by similarity (highest first) and return top_k
-    results.sort(key=lambda x: x["similarity"], reverse=True)
-    return results[:top_k]
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 3,
+        document_ids: Optional[List[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the chunks most similar to a query
+        
+        Args:
+            query_embedding: Embedding vector for the search query
+            top_k: Number of top results to return
+            document_ids: Optional list of document IDs to restrict the search to
+            
+        Returns:
+            List of (chunk_id, similarity) tuples sorted by similarity (highest first)
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        dimension = query.shape[0]
+        group = self._groups.get(dimension)
+        
+        # Chunks with a different embedding dimension can't be compared
+        mismatched = self.size - (len(group[0]) if group else 0)
+        if mismatched:
+            logger.error(f"Skipping {mismatched} chunk(s) whose embedding dimension differs from query={dimension}")
+        
+        if group is None or top_k <= 0:
+            return []
+        
+        chunk_ids, doc_ids, matrix = group
+        if document_ids is not None:
+            # Score only the rows of the requested documents; a single document
+            # is a zero-copy slice of the matrix
+            ranges = self._document_rows(doc_ids, document_ids)
+            if not ranges:
+                return []
+            if len(ranges) == 1:
+                start, stop = ranges[0]
+                chunk_ids, matrix = chunk_ids[start:stop], matrix[start:stop]
+            else:
+                rows = np.concatenate([np.arange(start, stop) for start, stop in ranges])
+                chunk_ids, matrix = chunk_ids[rows], matrix[rows]
+        
+        scores = cosine_scores(matrix, query, rows_normalized=True)
+        top_indices = _top_k_indices(scores, top_k)
+        
+        return [(int(chunk_ids[i]), float(scores[i])) for i in top_indices]
+
+
+# Cached snapshot of the active corpus and the corpus version it was built at
+_corpus_cache: Optional[Tuple[int, CorpusSnapshot]] = None
+_corpus_lock = threading.Lock()
 
+
+def get_corpus(session: Session) -> CorpusSnapshot:
+    """
+    Get a snapshot of the active corpus, reloading it only when it changed.
+    
+    The snapshot is cached in-process and reused until a commit adds chunks,
+    or toggles or deletes a document, so repeated searches skip the SQL query
+    and embedding decoding entirely.
+    
+    Args:
+        session: Database session used to load the corpus on a cache miss
+        
+    Returns:
+        The CorpusSnapshot for the current corpus version
+    """
+    global _corpus_cache
+    with _corpus_lock:
+        version = get_corpus_version()
+        if _corpus_cache is None or _corpus_cache[0] != version:
+            snapshot = CorpusSnapshot(
+                iter_active_chunk_embeddings(session),
+                size_hint=count_active_chunks(session)
+            )
+            _corpus_cache = (version, snapshot)
+        return _corpus_cache[1]
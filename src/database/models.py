@@ -3,7 +3,7 @@ SQLAlchemy ORM models for RAG knowledge base
 """
 from datetime import datetime
 from typing import List
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, LargeBinary
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 
 
@@ -52,7 +52,7 @@ class Chunk(Base):
         nullable=False
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
-    embedding: Mapped[str] = mapped_column(Text, nullable=False)  # JSON string
+    embedding: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)  # Raw float32 bytes
     start_page: Mapped[int] = mapped_column(Integer, nullable=True)
     end_page: Mapped[int] = mapped_column(Integer, nullable=True)
     chunk_number: Mapped[int] = mapped_column(Integer, nullable=True)
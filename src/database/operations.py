@@ -1,13 +1,63 @@
 """
 Database CRUD operations
 """
-import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, event, func
 
 from src.database.models import Document, Chunk
 
+# Incremented after every commit that changed the set of searchable chunks,
+# so in-memory search caches know when to reload
+_corpus_version = 0
+
+
+def _mark_corpus_changed(session: Session) -> None:
+    """Flag the session so the corpus version is bumped once it commits"""
+    session.info["corpus_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_corpus_version(session: Session) -> None:
+    global _corpus_version
+    if session.info.pop("corpus_changed", False):
+        _corpus_version += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_corpus_change(session: Session) -> None:
+    session.info.pop("corpus_changed", None)
+
+
+def get_corpus_version() -> int:
+    """
+    Get the current version of the searchable corpus
+    
+    Returns:
+        A counter that changes whenever chunks are added, or documents are
+        toggled or deleted, and the change is committed
+    """
+    return _corpus_version
+
+
+def encode_embedding(embedding: List[float]) -> bytes:
+    """
+    Encode an embedding for storage as an L2-normalized float32 BLOB
+    
+    Stored embeddings are always unit length, so searches can score them
+    with a plain dot product against a normalized query.
+    
+    Args:
+        embedding: Embedding vector
+        
+    Returns:
+        The normalized vector as raw float32 bytes
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    vector = vector / (np.linalg.norm(vector) + 1e-12)
+    return vector.tobytes()
+
 
 def get_document_by_id(session: Session, document_id: int) -> Optional[Document]:
     """
@@ -38,6 +88,24 @@ def get_document_by_title(session: Session, title: str) -> Optional[Document]:
     return session.execute(stmt).scalar_one_or_none()
 
 
+def check_title_available(session: Session, title: str) -> None:
+    """
+    Ensure no document_processing uses the given title yet
+    
+    Args:
+        session: Database session
+        title: Title to check
+        
+    Raises:
+        ValueError: If a document_processing with the same title already exists
+    """
+    if get_document_by_title(session, title):
+        raise ValueError(
+            f"Document with title '{title}' already exists. "
+            f"Please use a different title or delete the existing document_processing first."
+        )
+
+
 def create_document(
     session: Session,
     title: str,
@@ -60,12 +128,7 @@ def create_document(
         ValueError: If a document_processing with the same title already exists
     """
     # Check if document_processing already exists
-    existing = get_document_by_title(session, title)
-    if existing:
-        raise ValueError(
-            f"Document with title '{title}' already exists. "
-            f"Please use a different title or delete the existing document_processing first."
-        )
+    check_title_available(session, title)
     
     # Create new document_processing
     document = Document(
@@ -81,6 +144,15 @@ def create_document(
     return document
 
 
+def _increment_chunk_count(session: Session, document_id: int, added: int) -> None:
+    """Add newly inserted chunks to a document_processing's total_chunks in place"""
+    session.execute(
+        update(Document)
+        .where(Document.id == document_id)
+        .values(total_chunks=Document.total_chunks + added)
+    )
+
+
 def create_chunk(
     session: Session,
     document_id: int,
@@ -98,7 +170,7 @@ def create_chunk(
         session: Database session
         document_id: ID of the parent document_processing
         content: Text content of the chunk
-        embedding: Embedding vector
+        embedding: Embedding vector (normalized before storage)
         start_page: Starting page number
         end_page: Ending page number
         chunk_number: Chunk number in sequence
@@ -110,7 +182,7 @@ def create_chunk(
     chunk = Chunk(
         document_id=document_id,
         content=content,
-        embedding=json.dumps(embedding),
+        embedding=encode_embedding(embedding),
         start_page=start_page,
         end_page=end_page,
         chunk_number=chunk_number,
@@ -118,61 +190,167 @@ def create_chunk(
     )
     session.add(chunk)
     session.flush()
+    _increment_chunk_count(session, document_id, 1)
+    _mark_corpus_changed(session)
     
     return chunk
 
 
-def update_document_chunk_count(session: Session, document_id: int) -> None:
+def create_chunks_bulk(session: Session, document_id: int, rows: List[Dict[str, Any]]) -> List[int]:
     """
-    Update the total_chunks count for a document_processing
+    Create many chunks for a document_processing with a single executemany INSERT
+    
+    Args:
+        session: Database session
+        document_id: ID of the parent document_processing
+        rows: Chunk dictionaries with 'content' and 'embedding', and optionally
+            'start_page', 'end_page', 'chunk_number' and 'unit_name'
+        
+    Returns:
+        The IDs of the created chunks, in the same order as rows
+    """
+    if not rows:
+        return []
+    
+    params = [
+        {
+            "document_id": document_id,
+            "content": row["content"],
+            "embedding": encode_embedding(row["embedding"]),
+            "start_page": row.get("start_page"),
+            "end_page": row.get("end_page"),
+            "chunk_number": row.get("chunk_number"),
+            "unit_name": row.get("unit_name", "page")
+        }
+        for row in rows
+    ]
+    stmt = insert(Chunk).returning(Chunk.id, sort_by_parameter_order=True)
+    chunk_ids = list(session.scalars(stmt, params))
+    _increment_chunk_count(session, document_id, len(chunk_ids))
+    _mark_corpus_changed(session)
+    
+    return chunk_ids
+
+
+def update_document_chunk_count(session: Session, document_id: int, count: Optional[int] = None) -> None:
+    """
+    Overwrite the total_chunks count for a document_processing
+    
+    Chunk creation keeps total_chunks up to date, so this is only needed to
+    repair a count that has drifted.
     
     Args:
         session: Database session
         document_id: ID of the document_processing to update
+        count: Known number of chunks; if omitted, the chunks are counted
     """
-    document = session.get(Document, document_id)
-    if document:
-        chunk_count = session.query(Chunk).filter(Chunk.document_id == document_id).count()
-        document.total_chunks = chunk_count
-        session.flush()
+    if count is None:
+        count = session.query(Chunk).filter(Chunk.document_id == document_id).count()
+    
+    session.execute(
+        update(Document).where(Document.id == document_id).values(total_chunks=count)
+    )
 
 
-def get_active_chunks_with_documents(session: Session) -> List[Dict[str, Any]]:
+def count_active_chunks(session: Session) -> int:
     """
-    Get all chunks from active documents with their metadata
+    Count the chunks from active documents
     
     Args:
         session: Database session
         
     Returns:
-        List of dictionaries containing chunk and document_processing information
+        Number of searchable chunks
+    """
+    stmt = (
+        select(func.count(Chunk.id))
+        .join(Document, Chunk.document_id == Document.id)
+        .where(Document.active == 1)
+    )
+    return session.scalar(stmt)
+
+
+def iter_active_chunk_embeddings(
+    session: Session,
+    batch_size: int = 1024
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Stream the embeddings of all chunks from active documents, without content
+    
+    Rows are fetched in batches rather than materialized up front, so callers
+    can copy each embedding straight into a preallocated matrix.
+    
+    Args:
+        session: Database session
+        batch_size: Number of rows to fetch per batch
+        
+    Yields:
+        (chunk_id, document_id, embedding) tuples, with each embedding
+        decoded as a unit-length float32 array
     """
     stmt = (
-        select(Chunk, Document)
+        select(Chunk.id, Chunk.document_id, Chunk.embedding)
         .join(Document, Chunk.document_id == Document.id)
         .where(Document.active == 1)
+        .execution_options(yield_per=batch_size)
     )
     
-    results = session.execute(stmt).all()
+    for chunk_id, document_id, embedding in session.execute(stmt):
+        yield chunk_id, document_id, np.frombuffer(embedding, dtype=np.float32)
+
+
+def get_chunks_with_documents_by_ids(session: Session, chunk_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Get chunks and their document metadata for a set of chunk IDs
     
-    chunks_data = []
-    for chunk, document in results:
-        chunks_data.append({
-            "chunk_id": chunk.id,
-            "content": chunk.content,
-            "embedding": json.loads(chunk.embedding),
-            "start_page": chunk.start_page,
-            "end_page": chunk.end_page,
-            "chunk_number": chunk.chunk_number,
-            "unit_name": chunk.unit_name,
-            "document_id": document.id,
-            "title": document.title,
-            "description": document.description,
-            "source_type": document.source_type,
-            "total_chunks": document.total_chunks
-        })
+    Args:
+        session: Database session
+        chunk_ids: IDs of the chunks to fetch
+        
+    Returns:
+        Dictionary mapping chunk ID to chunk and document_processing
+        information (without the embedding)
+    """
+    if not chunk_ids:
+        return {}
+    
+    stmt = (
+        select(
+            Chunk.id,
+            Chunk.content,
+            Chunk.start_page,
+            Chunk.end_page,
+            Chunk.chunk_number,
+            Chunk.unit_name,
+            Document.id,
+            Document.title,
+            Document.description,
+            Document.source_type,
+            Document.total_chunks
+        )
+        .join(Document, Chunk.document_id == Document.id)
+        .where(Chunk.id.in_(chunk_ids))
+    )
     
-    return chunks_data
+    return {
+        chunk_id: {
+            "chunk_id": chunk_id,
+            "content": content,
+            "start_page": start_page,
+            "end_page": end_page,
+            "chunk_number": chunk_number,
+            "unit_name": unit_name,
+            "document_id": document_id,
+            "title": title,
+            "description": description,
+            "source_type": source_type,
+            "total_chunks": total_chunks
+        }
+        for (
+            chunk_id, content, start_page, end_page, chunk_number, unit_name,
+            document_id, title, description, source_type, total_chunks
+        ) in session.execute(stmt)
+    }
 
 
 def get_all_documents(session: Session) -> List[Document]:
@@ -204,9 +382,11 @@ def toggle_document_active(session: Session, title: str, active: bool) -> Option
     stmt = select(Document).where(Document.title == title)
     document = session.execute(stmt).scalar_one_or_none()
     
-    if document:
+    # Nothing to write when the document already has the requested status
+    if document and document.active != (1 if active else 0):
         document.active = 1 if active else 0
         session.flush()
+        _mark_corpus_changed(session)
     
     return document
 
@@ -222,14 +402,23 @@ def delete_document(session: Session, title: str) -> Optional[int]:
     Returns:
         The number of chunks that were deleted, or None if document_processing not found
     """
-    stmt = select(Document).where(Document.title == title)
-    document = session.execute(stmt).scalar_one_or_none()
+    stmt = select(Document.id, Document.total_chunks).where(Document.title == title)
+    row = session.execute(stmt).one_or_none()
     
-    if document:
-        chunk_count = document.total_chunks
-        session.delete(document)
-        session.flush()
-        return chunk_count
+    if row is None:
+        return None
     
-    return None
+    # Delete with two statements instead of loading every chunk (and its
+    # embedding) into the session for the ORM cascade
+    document_id, chunk_count = row
+    session.execute(
+        delete(Chunk).where(Chunk.document_id == document_id),
+        execution_options={"synchronize_session": False}
+    )
+    session.execute(
+        delete(Document).where(Document.id == document_id),
+        execution_options={"synchronize_session": False}
+    )
+    _mark_corpus_changed(session)
+    return chunk_count
 
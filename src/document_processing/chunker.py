@@ -18,25 +18,11 @@ def split_text_by_words(text: str, words_per_page: int = 300) -> List[str]:
     # Split text into words
     words = text.split()
     
-    if not words:
-        return []
-    
-    pages = []
-    current_page_words = []
-    
-    for word in words:
-        current_page_words.append(word)
-        
-        # When we reach the target word count, create a new page
-        if len(current_page_words) >= words_per_page:
-            pages.append(' '.join(current_page_words))
-            current_page_words = []
-    
-    # Add any remaining words as the last page
-    if current_page_words:
-        pages.append(' '.join(current_page_words))
-    
-    return pages
+    # Join each run of words_per_page words directly (the last page may be shorter)
+    return [
+        ' '.join(words[i:i + words_per_page])
+        for i in range(0, len(words), words_per_page)
+    ]
 
 
 def chunk_pages(pages: List[str], pages_per_chunk: int = 3, unit_name: str = "page") -> List[Dict[str, Any]]:
@@ -1,20 +1,39 @@
 """
 Embedding generation using OpenAI
 """
-from typing import List
+from typing import List, Optional
 from openai import OpenAI
-from src.config import OPENAI_API_KEY
+from src.config import OPENAI_API_KEY, EMBEDDING_MODEL, EMBEDDING_DIM
+
+# Number of times a failed embedding request (rate limit, timeout, 5xx) is
+# retried during ingestion; the client backs off exponentially with jitter
+# between attempts. Search queries keep the client's default so they fail
+# fast instead of outliving the chat's request timeout
+EMBEDDING_MAX_RETRIES = 6
 
 # Initialize OpenAI client
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# The dimensions argument is only sent when a dimension is configured, since
+# models other than text-embedding-3 reject it
+_dimension_args = {"dimensions": EMBEDDING_DIM} if EMBEDDING_DIM else {}
+
+
+def _client_for(max_retries: Optional[int]) -> OpenAI:
+    """Return the shared client, with max_retries overridden if given"""
+    return client if max_retries is None else client.with_options(max_retries=max_retries)
 
-def create_embedding(text: str) -> List[float]:
+
+def create_embedding(text: str, max_retries: Optional[int] = None) -> List[float]:
     """
-    Create embedding using OpenAI's text-embedding-3-small model
+    Create embedding using the configured OpenAI embedding model
+    
+    The vector length is fixed to EMBEDDING_DIM (or the model's native size
+    if it isn't set) so every stored chunk and every query share one dimension.
     
     Args:
         text: Text to embed
+        max_retries: Retries for a failed request (defaults to the client's)
         
     Returns:
         Embedding vector as list of floats
@@ -23,9 +42,10 @@ def create_embedding(text: str) -> List[float]:
         Exception: If embedding creation fails or token limit is exceeded
     """
     try:
-        response = client.embeddings.create(
+        response = _client_for(max_retries).embeddings.create(
             input=text,
-            model="text-embedding-3-small"
+            model=EMBEDDING_MODEL,
+            **_dimension_args
         )
         return response.data[0].embedding
     except Exception as e:
@@ -36,3 +56,31 @@ def create_embedding(text: str) -> List[float]:
             raise Exception(f"TOKEN_LIMIT_EXCEEDED: {error_str}")
         raise Exception(f"Error creating embedding: {str(e)}")
 
+
+def create_embeddings_batch(texts: List[str], max_retries: Optional[int] = None) -> List[List[float]]:
+    """
+    Create embeddings for several texts with a single API request
+    
+    Args:
+        texts: Texts to embed (at most 2048 per request)
+        max_retries: Retries for a failed request (defaults to the client's)
+        
+    Returns:
+        Embedding vectors in the same order as texts
+        
+    Raises:
+        Exception: If embedding creation fails, any text exceeds the token limit
+            or the texts together exceed the per-request token limit
+    """
+    try:
+        response = _client_for(max_retries).embeddings.create(
+            input=texts,
+            model=EMBEDDING_MODEL,
+            **_dimension_args
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+    except Exception as e:
+        error_str = str(e)
+        if "maximum context length" in error_str or "8192 tokens" in error_str or "tokens per request" in error_str:
+            raise Exception(f"TOKEN_LIMIT_EXCEEDED: {error_str}")
+        raise Exception(f"Error creating embeddings: {str(e)}")
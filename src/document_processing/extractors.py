@@ -2,10 +2,13 @@
 Text extraction from various document_processing formats (PDF, EPUB, TXT)
 """
 import os
-import PyPDF2
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pymupdf
 import ebooklib
 from ebooklib import epub
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 from typing import List
 
 
@@ -30,6 +33,44 @@ def get_file_type(file_path: str) -> str:
         return 'unsupported'
 
 
+# Minimum number of PDF pages per extraction worker process; smaller PDFs are
+# extracted in-process, since starting a worker costs a few hundred milliseconds
+PDF_PAGES_PER_WORKER = 128
+
+
+def _extract_pdf_page_range(pdf_file_path: str, start: int, stop: int) -> List[str]:
+    """Extract the text of pages [start, stop) from a PDF (runs in a worker process)"""
+    with pymupdf.open(pdf_file_path) as doc:
+        return [doc[page_num].get_text("text") for page_num in range(start, stop)]
+
+
+def _extract_pdf_in_parallel(pdf_file_path: str, page_count: int) -> List[str]:
+    """
+    Extract the text of a large PDF using one worker process per page range
+    
+    PyMuPDF is not thread-safe, so each worker opens its own copy of the
+    document instead of sharing one across threads.
+    
+    Args:
+        pdf_file_path: Path to the PDF file
+        page_count: Number of pages in the PDF
+        
+    Returns:
+        List of strings, one per page
+    """
+    workers = min(os.cpu_count() or 1, page_count // PDF_PAGES_PER_WORKER)
+    if workers < 2:
+        return _extract_pdf_page_range(pdf_file_path, 0, page_count)
+    
+    bounds = [page_count * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        page_ranges = executor.map(
+            _extract_pdf_page_range,
+            [pdf_file_path] * workers, bounds[:-1], bounds[1:]
+        )
+        return [text for page_range in page_ranges for text in page_range]
+
+
 def extract_text_from_pdf(pdf_file_path: str) -> List[str]:
     """
     Extract text from PDF, returning a list where each element is a page's text
@@ -43,22 +84,19 @@ def extract_text_from_pdf(pdf_file_path: str) -> List[str]:
     Raises:
         Exception: If file is corrupted or cannot be read
     """
-    pages_text = []
-    
     try:
-        with open(pdf_file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
+        with pymupdf.open(pdf_file_path) as doc:
             # Check if PDF is corrupted
-            if len(pdf_reader.pages) == 0:
+            if doc.page_count == 0:
                 raise Exception("PDF file is empty or corrupted")
             
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text = page.extract_text()
-                pages_text.append(text)
+            page_count = doc.page_count
+            if page_count < 2 * PDF_PAGES_PER_WORKER:
+                return [page.get_text("text") for page in doc]
+        
+        pages_text = _extract_pdf_in_parallel(pdf_file_path, page_count)
                 
-    except PyPDF2.errors.PdfReadError as e:
+    except pymupdf.FileDataError as e:
         raise Exception(f"Corrupted or invalid PDF file: {str(e)}")
     except Exception as e:
         raise Exception(f"Error reading PDF: {str(e)}")
@@ -66,6 +104,27 @@ def extract_text_from_pdf(pdf_file_path: str) -> List[str]:
     return pages_text
 
 
+def _html_to_text(content: bytes) -> str:
+    """
+    Extract the visible text of an HTML/XHTML document
+    
+    Args:
+        content: Raw HTML bytes
+        
+    Returns:
+        The text of all elements joined by single spaces, without scripts,
+        stylesheets or comments
+    """
+    try:
+        root = lxml.html.fromstring(content)
+    except etree.ParserError:
+        # Empty document
+        return ""
+    
+    etree.strip_elements(root, 'script', 'style', etree.Comment, with_tail=False)
+    return ' '.join(text.strip() for text in root.itertext() if text.strip())
+
+
 def extract_text_from_epub(epub_file_path: str) -> List[str]:
     """
     Extract text from EPUB, returning a list where each element is a page's text
@@ -92,10 +151,8 @@ def extract_text_from_epub(epub_file_path: str) -> List[str]:
         # Extract all text from all chapters into one continuous text
         full_text = []
         for item in items:
-            # Parse HTML content
-            soup = BeautifulSoup(item.get_content(), 'html.parser')
-            # Extract text
-            text = soup.get_text(separator=' ', strip=True)
+            # Parse HTML content and extract text
+            text = _html_to_text(item.get_content())
             if text:
                 full_text.append(text)
         
@@ -132,8 +189,16 @@ def extract_text_from_txt(txt_file_path: str) -> List[str]:
         Exception: If file cannot be read
     """
     try:
-        with open(txt_file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+        # Read the bytes once; if they aren't valid UTF-8, decode the same
+        # buffer as Latin-1 instead of reading the file again
+        with open(txt_file_path, 'rb') as file:
+            raw = file.read()
+        
+        try:
+            content = raw.decode('utf-8-sig')
+        except UnicodeDecodeError:
+            content = raw.decode('latin-1')
+        del raw
         
         if not content.strip():
             raise Exception("TXT file is empty")
@@ -144,17 +209,5 @@ def extract_text_from_txt(txt_file_path: str) -> List[str]:
         
         return pages
                 
-    except UnicodeDecodeError:
-        # Try with different encoding
-        try:
-            with open(txt_file_path, 'r', encoding='latin-1') as file:
-                content = file.read()
-            
-            from .chunker import split_text_by_words
-            pages = split_text_by_words(content, words_per_page=300)
-            return pages
-        except Exception as e:
-            raise Exception(f"Error reading TXT file with alternative encoding: {str(e)}")
     except Exception as e:
         raise Exception(f"Error reading TXT: {str(e)}")
-
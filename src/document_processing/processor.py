@@ -2,9 +2,14 @@
 Document processing orchestration
 Handles extraction, chunking, embedding, and storage
 """
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
 
-from src.document_processing.embeddings import create_embedding
+from src.document_processing.embeddings import (
+    create_embedding,
+    create_embeddings_batch,
+    EMBEDDING_MAX_RETRIES
+)
 from src.document_processing.extractors import (
     get_file_type,
     extract_text_from_pdf,
@@ -14,29 +19,142 @@ from src.document_processing.extractors import (
 from src.document_processing.chunker import chunk_pages
 from src.database.database import get_session
 from src.database.operations import (
+    check_title_available,
     create_document,
-    create_chunk,
-    update_document_chunk_count
+    create_chunks_bulk
 )
 
 
+# Number of chunks embedded per API request during ingestion
+EMBEDDING_BATCH_SIZE = 256
+
+# Estimated tokens per API request during ingestion, kept below the API's
+# limit of 300k tokens per request
+EMBEDDING_BATCH_TOKENS = 250_000
+
+# Maximum number of concurrent embedding requests for chunks embedded one by one
+EMBEDDING_CONCURRENCY = 8
+
+
+def build_embedding_text(chunk_text: str, source_name: str, description: str, prepend_metadata: bool = True) -> str:
+    """
+    Build the text sent to the embedding model for a chunk
+    
+    Args:
+        chunk_text: The chunk text
+        source_name: Name of the source document_processing
+        description: Description of the source document_processing
+        prepend_metadata: Whether to prepend source_name + description
+        
+    Returns:
+        The text to embed
+    """
+    if prepend_metadata:
+        return f"{source_name}\n{description}\n\n{chunk_text}"
+    return chunk_text
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text without running a tokenizer
+    
+    Args:
+        text: Text to estimate
+        
+    Returns:
+        Estimated token count (about 3 characters per token, which overestimates
+        typical English text)
+    """
+    return len(text) // 3 + 1
+
+
+def iter_embedding_batches(texts: List[str]) -> Iterator[List[int]]:
+    """
+    Group texts into batches that fit in one embedding request
+    
+    Args:
+        texts: Texts to embed
+        
+    Yields:
+        Indices of the texts in each batch, in order; a batch holds at most
+        EMBEDDING_BATCH_SIZE texts and EMBEDDING_BATCH_TOKENS estimated tokens
+    """
+    batch = []
+    batch_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= EMBEDDING_BATCH_SIZE or batch_tokens + tokens > EMBEDDING_BATCH_TOKENS):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_batch_bisecting(texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    Embed a batch of texts, isolating any text over the token limit
+    
+    When the request fails on the token limit, the batch is split in half and
+    each half retried, so only the offending texts are left unembedded.
+    
+    Args:
+        texts: Texts to embed
+        
+    Returns:
+        Embedding vectors in the same order as texts, with None for each text
+        that has to be embedded one by one (with splitting)
+    """
+    try:
+        return create_embeddings_batch(texts, max_retries=EMBEDDING_MAX_RETRIES)
+    except Exception as e:
+        if "TOKEN_LIMIT_EXCEEDED" not in str(e):
+            print(f"Warning: Batch embedding failed, embedding chunks individually: {e}")
+            return [None] * len(texts)
+        if len(texts) == 1:
+            return [None]
+    
+    middle = len(texts) // 2
+    return embed_batch_bisecting(texts[:middle]) + embed_batch_bisecting(texts[middle:])
+
+
+def build_chunk_row(chunk_text: str, chunk_metadata: Dict[str, Any], embedding: List[float]) -> Dict[str, Any]:
+    """
+    Build a chunk row ready to be inserted with create_chunks_bulk
+    
+    Args:
+        chunk_text: The chunk text
+        chunk_metadata: Metadata for the chunk
+        embedding: Embedding vector for the chunk
+        
+    Returns:
+        Chunk row with content, embedding and page metadata
+    """
+    return {
+        "content": chunk_text,
+        "embedding": embedding,
+        "start_page": chunk_metadata.get('start_page'),
+        "end_page": chunk_metadata.get('end_page'),
+        "chunk_number": chunk_metadata.get('chunk_number'),
+        "unit_name": chunk_metadata.get('unit_name', 'page')
+    }
+
+
 def process_chunk_with_splitting(
-    session,
     chunk_text: str,
-    document_id: int,
     chunk_metadata: Dict[str, Any],
     source_name: str,
     description: str,
     prepend_metadata: bool = True,
     max_depth: int = 3
-) -> List[int]:
+) -> List[Dict[str, Any]]:
     """
-    Process a chunk and split it if it's too large for embedding
+    Embed a chunk and split it if it's too large for embedding
     
     Args:
-        session: Database session
         chunk_text: The chunk text to process
-        document_id: ID of the parent document_processing
         chunk_metadata: Metadata for the chunk
         source_name: Name of the source document_processing (for prepending)
         description: Description of the source document_processing (for prepending)
@@ -44,34 +162,20 @@ def process_chunk_with_splitting(
         max_depth: Maximum number of times to split (prevents infinite recursion)
         
     Returns:
-        List of chunk IDs created
+        List of chunk rows (content, embedding and page metadata) ready to be
+        inserted with create_chunks_bulk
     """
     if max_depth <= 0:
         raise Exception("Chunk is too large even after multiple splits")
     
-    # Create the text to embed: optionally prepend source_name + description
-    if prepend_metadata:
-        text_to_embed = f"{source_name}\n{description}\n\n{chunk_text}"
-    else:
-        text_to_embed = chunk_text
+    text_to_embed = build_embedding_text(chunk_text, source_name, description, prepend_metadata)
     
     try:
         # Try to create embedding
-        embedding = create_embedding(text_to_embed)
-        
-        # Success! Store in database
-        chunk = create_chunk(
-            session=session,
-            document_id=document_id,
-            content=chunk_text,
-            embedding=embedding,
-            start_page=chunk_metadata.get('start_page'),
-            end_page=chunk_metadata.get('end_page'),
-            chunk_number=chunk_metadata.get('chunk_number'),
-            unit_name=chunk_metadata.get('unit_name', 'page')
-        )
+        embedding = create_embedding(text_to_embed, max_retries=EMBEDDING_MAX_RETRIES)
         
-        return [chunk.id]
+        # Success! Return the row to be stored in the database
+        return [build_chunk_row(chunk_text, chunk_metadata, embedding)]
         
     except Exception as e:
         # Check if it's a token limit error
@@ -80,11 +184,14 @@ def process_chunk_with_splitting(
             mid_point = len(chunk_text) // 2
             
             # Find a good split point (prefer splitting at sentence or paragraph boundary)
+            # within 500 characters of the middle; slice the window once and search it
             split_point = mid_point
+            window_start = max(mid_point - 500, 0)
+            window = chunk_text[window_start:mid_point + 500]
             for delimiter in ['\n\n', '\n', '. ', ' ']:
-                pos = chunk_text.rfind(delimiter, mid_point - 500, mid_point + 500)
+                pos = window.rfind(delimiter)
                 if pos != -1:
-                    split_point = pos + len(delimiter)
+                    split_point = window_start + pos + len(delimiter)
                     break
             
             first_half = chunk_text[:split_point].strip()
@@ -98,17 +205,17 @@ def process_chunk_with_splitting(
             second_metadata["split_part"] = "2/2"
             
             # Recursively process both halves
-            chunk_ids = []
-            chunk_ids.extend(process_chunk_with_splitting(
-                session, first_half, document_id, first_metadata,
+            chunk_rows = []
+            chunk_rows.extend(process_chunk_with_splitting(
+                first_half, first_metadata,
                 source_name, description, prepend_metadata, max_depth - 1
             ))
-            chunk_ids.extend(process_chunk_with_splitting(
-                session, second_half, document_id, second_metadata,
+            chunk_rows.extend(process_chunk_with_splitting(
+                second_half, second_metadata,
                 source_name, description, prepend_metadata, max_depth - 1
             ))
             
-            return chunk_ids
+            return chunk_rows
         else:
             # Different error, re-raise
             raise
@@ -158,55 +265,76 @@ def process_document(
         # Chunk the pages/chapters
         chunks = chunk_pages(pages, pages_per_chunk, unit_name)
         
+        # Fail fast on a duplicate title before spending any embedding calls
+        with get_session() as session:
+            check_title_available(session, source_name)
+        
         # Process each chunk (with automatic splitting if needed)
-        processed_chunks = []
+        chunk_rows = []
+        chunk_infos = []
         failed_chunks = []
         total_splits = 0
         
-        # Use a single database session for all operations
-        with get_session() as session:
-            # Create the document_processing (will raise ValueError if title exists)
-            document = create_document(
-                session=session,
-                title=source_name,
-                description=description,
-                source_type=file_type
-            )
+        chunk_metadatas = [
+            {
+                "start_page": chunk['start_page'],
+                "end_page": chunk['end_page'],
+                "chunk_number": i + 1,
+                "total_chunks": len(chunks),
+                "unit_name": unit_name
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+        
+        embedding_texts = [
+            build_embedding_text(chunk['text'], source_name, description, prepend_metadata)
+            for chunk in chunks
+        ]
+        
+        for batch_indices in iter_embedding_batches(embedding_texts):
+            # Embed the whole batch with one request; chunks over the token
+            # limit are isolated and embedded one by one below
+            batch_embeddings = embed_batch_bisecting([embedding_texts[i] for i in batch_indices])
             
-            for i, chunk in enumerate(chunks):
-                chunk_metadata = {
-                    "start_page": chunk['start_page'],
-                    "end_page": chunk['end_page'],
-                    "chunk_number": i + 1,
-                    "total_chunks": len(chunks),
-                    "unit_name": unit_name
-                }
+            # Embed the chunks left over one by one (with automatic splitting if
+            # needed), running the requests concurrently since each is a round trip
+            fallback_indices = [i for i, embedding in zip(batch_indices, batch_embeddings) if embedding is None]
+            fallback_results = {}
+            if fallback_indices:
+                with ThreadPoolExecutor(max_workers=min(EMBEDDING_CONCURRENCY, len(fallback_indices))) as executor:
+                    fallback_results = {
+                        i: executor.submit(
+                            process_chunk_with_splitting,
+                            chunk_text=chunks[i]['text'],
+                            chunk_metadata=chunk_metadatas[i],
+                            source_name=source_name,
+                            description=description,
+                            prepend_metadata=prepend_metadata
+                        )
+                        for i in fallback_indices
+                    }
+            
+            for i, embedding in zip(batch_indices, batch_embeddings):
+                chunk = chunks[i]
                 
                 try:
-                    # Process chunk with automatic splitting if needed
-                    chunk_ids = process_chunk_with_splitting(
-                        session=session,
-                        chunk_text=chunk['text'],
-                        document_id=document.id,
-                        chunk_metadata=chunk_metadata,
-                        source_name=source_name,
-                        description=description,
-                        prepend_metadata=prepend_metadata
-                    )
+                    if embedding is not None:
+                        rows = [build_chunk_row(chunk['text'], chunk_metadatas[i], embedding)]
+                    else:
+                        rows = fallback_results[i].result()
                     
                     # Track how many sub-chunks were created
-                    if len(chunk_ids) > 1:
-                        total_splits += len(chunk_ids) - 1
+                    if len(rows) > 1:
+                        total_splits += len(rows) - 1
                     
-                    # Add info about all created chunks
-                    for idx, chunk_id in enumerate(chunk_ids):
-                        suffix = f" (split {idx + 1}/{len(chunk_ids)})" if len(chunk_ids) > 1 else ""
-                        processed_chunks.append({
-                            "chunk_id": chunk_id,
-                            "doc_id": chunk_id,  # For backward compatibility
+                    # Keep info about all sub-chunks for the summary
+                    for idx in range(len(rows)):
+                        suffix = f" (split {idx + 1}/{len(rows)})" if len(rows) > 1 else ""
+                        chunk_infos.append({
                             "chunk_number": i + 1,
                             "pages": f"{chunk['start_page']}-{chunk['end_page']}{suffix}"
                         })
+                    chunk_rows.extend(rows)
                 except Exception as e:
                     # Log failed chunk but continue processing
                     error_msg = str(e)
@@ -217,13 +345,32 @@ def process_document(
                     })
                     print(f"Warning: Failed to process chunk {i + 1} ({chunk['start_page']}-{chunk['end_page']}): {error_msg}")
                     continue
+        
+        # Store the document and all its chunks in a single short transaction
+        with get_session() as session:
+            # Create the document_processing (will raise ValueError if title exists)
+            document = create_document(
+                session=session,
+                title=source_name,
+                description=description,
+                source_type=file_type
+            )
             
-            # Update the document_processing's total_chunks count
-            update_document_chunk_count(session, document.id)
+            # Insert all chunks with one executemany INSERT (also updates total_chunks)
+            chunk_ids = create_chunks_bulk(session, document.id, chunk_rows)
             
             # Commit all changes
             session.commit()
         
+        processed_chunks = [
+            {
+                "chunk_id": chunk_id,
+                "doc_id": chunk_id,  # For backward compatibility
+                **info
+            }
+            for chunk_id, info in zip(chunk_ids, chunk_infos)
+        ]
+        
         result = {
             "success": True,
             "source_name": source_name,
@@ -2,23 +2,30 @@
 FastAPI MCP Server with RAG functionality
 Routes layer - handles HTTP requests/responses only
 """
-import json
+import asyncio
+import hashlib
+import orjson
 from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 import tempfile
 import os
 import logging
 import traceback
 
 from src.config import OPENAI_API_KEY, DB_PATH
-from src.document_processing.processor import process_document
 from src.mcp_server import services
+from src.mcp_server.embedding_cache import query_embedding_cache
+from src.mcp_server.upload_jobs import submit_upload, get_upload_job, run_upload
 from src.mcp_server.tools import (
     TOOLS,
+    TOOLS_JSON,
     ToolCallRequest,
     ToolCallResponse,
+    SearchBatchRequest,
+    SearchBatchResponse,
     handle_search_knowledge_base,
+    handle_search_knowledge_base_batch,
     handle_get_available_sources,
     handle_search_specific_documents
 )
@@ -31,6 +38,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Size of the reads used to copy uploads to disk
+UPLOAD_READ_SIZE = 1 << 20
+
+# The tool list only changes with a new release; sources can change at any
+# time, so clients must revalidate them (cheap with If-None-Match)
+TOOLS_CACHE_CONTROL = "public, max-age=3600, immutable"
+SOURCES_CACHE_CONTROL = "no-cache"
+
 app = FastAPI(title="RAG MCP Server")
 
 # Initialize OpenAI client
@@ -68,12 +83,39 @@ async def upload_page():
         )
 
 
+def _json_with_etag(request: Request, body: bytes, cache_control: str) -> Response:
+    """
+    Build a JSON response with an ETag, or an empty 304 if the client has it
+    
+    Args:
+        request: Incoming request (checked for If-None-Match)
+        body: Serialized JSON body
+        cache_control: Cache-Control header value
+        
+    Returns:
+        200 response with the body, or 304 when the ETag matches
+    """
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/mcp/tools")
-async def list_tools():
+async def list_tools(request: Request):
     """List available MCP tools"""
     logger.info("Request received: GET /mcp/tools - Listing available tools")
     logger.info(f"Returning {len(TOOLS)} available tool(s)")
-    return {"tools": [tool.dict() for tool in TOOLS]}
+    return _json_with_etag(request, TOOLS_JSON, TOOLS_CACHE_CONTROL)
+
+
+@app.get("/mcp/cache/stats")
+async def cache_stats():
+    """Get the query embedding cache counters"""
+    return query_embedding_cache.stats()
 
 
 @app.post("/mcp/tools/call")
@@ -82,7 +124,7 @@ async def call_tool(request: ToolCallRequest) -> ToolCallResponse:
     logger.info("=" * 80)
     logger.info("MCP TOOL CALL RECEIVED")
     logger.info(f"Tool Name: {request.name}")
-    logger.info(f"Arguments: {json.dumps(request.arguments, indent=2)}")
+    logger.info(f"Arguments: {orjson.dumps(request.arguments).decode()}")
     logger.info("=" * 80)
     
     try:
@@ -112,15 +154,28 @@ async def call_tool(request: ToolCallRequest) -> ToolCallResponse:
         )
 
 
+@app.post("/mcp/tools/call_batch")
+async def call_tool_batch(request: SearchBatchRequest) -> SearchBatchResponse:
+    """Run search_knowledge_base for several queries, embedding them together"""
+    logger.info(f"MCP BATCH TOOL CALL RECEIVED: search_knowledge_base x{len(request.queries)}")
+    return await handle_search_knowledge_base_batch(request.queries, request.top_k)
+
+
 @app.post("/upload-pdf")
 async def upload_document(
     pdf_file: UploadFile = File(...),
     source_name: str = Form(...),
     description: str = Form(...),
     pages_per_chunk: int = Form(3),
-    prepend_metadata: bool = Form(True)
+    prepend_metadata: bool = Form(True),
+    wait: bool = False
 ):
-    """Handle document_processing upload and processing (PDF, EPUB, or TXT)"""
+    """
+    Handle document_processing upload and processing (PDF, EPUB, or TXT)
+    
+    By default the document_processing is processed in the background and a job ID
+    is returned with status 202; pass ?wait=true to process it within the request.
+    """
     logger.info(f"Received document_processing upload: '{pdf_file.filename}' for '{source_name}' (pages_per_chunk={pages_per_chunk}, prepend_metadata={prepend_metadata})")
     
     try:
@@ -142,39 +197,39 @@ async def upload_document(
                 status_code=400
             )
         
-        # Save uploaded file to temporary location
+        # Save uploaded file to temporary location, 1 MiB at a time
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-            content = await pdf_file.read()
-            tmp_file.write(content)
+            while chunk := await pdf_file.read(UPLOAD_READ_SIZE):
+                tmp_file.write(chunk)
             tmp_file_path = tmp_file.name
         
         logger.info(f"Saved temporary {file_type} file: {tmp_file_path}")
         
-        # Process the document_processing
-        result = process_document(
-            file_path=tmp_file_path,
-            source_name=source_name,
-            description=description,
-            pages_per_chunk=pages_per_chunk,
-            prepend_metadata=prepend_metadata
-        )
+        process_args = {
+            "source_name": source_name,
+            "description": description,
+            "pages_per_chunk": pages_per_chunk,
+            "prepend_metadata": prepend_metadata
+        }
         
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
-        logger.info(f"Cleaned up temporary file: {tmp_file_path}")
+        if not wait:
+            # Process the document_processing in the background; poll /uploads/{job_id}
+            job_id = submit_upload(tmp_file_path, file_type, **process_args)
+            logger.info(f"Queued {file_type} for processing as job {job_id}")
+            return JSONResponse(
+                content={"success": True, "job_id": job_id, "status": "queued"},
+                status_code=202
+            )
         
-        if result.get("success"):
-            logger.info(f"Successfully processed {file_type}: {result.get('total_chunks')} chunks created")
-        else:
-            error_msg = result.get('error', '')
-            logger.error(f"{file_type} processing failed: {error_msg}")
-            
-            # Check if it's a duplicate title error
-            if "already exists" in error_msg:
-                return JSONResponse(
-                    content=result,
-                    status_code=409  # Conflict status code
-                )
+        # Process the document_processing
+        result = await asyncio.to_thread(run_upload, tmp_file_path, file_type, **process_args)
+        
+        # Check if it's a duplicate title error
+        if not result.get("success") and "already exists" in result.get("error", ""):
+            return JSONResponse(
+                content=result,
+                status_code=409  # Conflict status code
+            )
         
         return JSONResponse(content=result)
         
@@ -187,12 +242,26 @@ async def upload_document(
         )
 
 
+@app.get("/uploads/{job_id}")
+async def get_upload_status(job_id: str):
+    """Get the status and, once finished, the result of an upload job"""
+    job = get_upload_job(job_id)
+    
+    if job is None:
+        return JSONResponse(
+            content={"success": False, "error": f"Upload job '{job_id}' not found"},
+            status_code=404
+        )
+    
+    return {"success": True, **job}
+
+
 @app.get("/sources")
-async def list_sources():
+async def list_sources(request: Request):
     """Get list of all unique sources with their status"""
     logger.info("Request received: GET /sources - Listing all sources")
     
-    success, message, sources = services.list_all_sources()
+    success, message, sources = await asyncio.to_thread(services.list_all_sources)
     
     if not success:
         return JSONResponse(
@@ -200,7 +269,8 @@ async def list_sources():
             status_code=500
         )
     
-    return {"success": True, "sources": sources}
+    body = orjson.dumps({"success": True, "sources": sources})
+    return _json_with_etag(request, body, SOURCES_CACHE_CONTROL)
 
 
 @app.post("/sources/toggle")
@@ -211,7 +281,7 @@ async def toggle_source(request: dict):
     
     logger.info(f"Request received: POST /sources/toggle - title='{title}', active={active}")
     
-    success, message, data = services.toggle_source_active(title, active)
+    success, message, data = await asyncio.to_thread(services.toggle_source_active, title, active)
     
     if not success:
         if "not found" in message.lower():
@@ -236,7 +306,7 @@ async def delete_source_route(request: dict):
     
     logger.info(f"Request received: POST /sources/delete - title='{title}'")
     
-    success, message, data = services.delete_source(title)
+    success, message, data = await asyncio.to_thread(services.delete_source, title)
     
     if not success:
         if "not found" in message.lower():
@@ -0,0 +1,161 @@
+"""
+In-process cache of query embeddings
+
+Search queries are embedded with a network round trip to OpenAI; repeated
+queries reuse the cached vector instead.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Tuple
+
+from src.document_processing.embeddings import create_embedding, create_embeddings_batch
+
+# Maximum number of cached queries and how long each entry stays valid
+CACHE_MAX_SIZE = 2048
+CACHE_TTL_SECONDS = 600
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings with a time-to-live"""
+    
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, ttl: float = CACHE_TTL_SECONDS):
+        """
+        Args:
+            max_size: Maximum number of cached queries
+            ttl: Seconds after which a cached embedding is recreated
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query into its cache key"""
+        return query.strip().lower()
+    
+    def get_or_create(self, query: str) -> List[float]:
+        """
+        Get the embedding for a query, creating it on a cache miss
+        
+        Args:
+            query: Search query string
+        
+        Returns:
+            Embedding vector for the query
+        """
+        key = self.normalize(query)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        
+        # Call the API outside the lock so other queries aren't blocked
+        embedding = create_embedding(query)
+        
+        with self._lock:
+            self._entries[key] = (now, embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        
+        return embedding
+    
+    def get_or_create_many(self, queries: List[str]) -> List[List[float]]:
+        """
+        Get the embeddings for several queries, creating all missing ones
+        with a single API request
+        
+        Args:
+            queries: Search query strings
+        
+        Returns:
+            Embedding vectors in the same order as queries
+        """
+        keys = [self.normalize(query) for query in queries]
+        now = time.monotonic()
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        
+        with self._lock:
+            for key, query in zip(keys, queries):
+                if key in found or key in missing:
+                    continue
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[0] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[key] = entry[1]
+                else:
+                    self.misses += 1
+                    missing[key] = query
+        
+        if missing:
+            # Call the API outside the lock so other queries aren't blocked
+            embeddings = create_embeddings_batch(list(missing.values()))
+            found.update(zip(missing.keys(), embeddings))
+            
+            with self._lock:
+                for key in missing:
+                    self._entries[key] = (now, found[key])
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        
+        return [found[key] for key in keys]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters
+        
+        Returns:
+            Dictionary with size, max_size, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+query_embedding_cache = QueryEmbeddingCache()
+
+
+def get_or_create_embedding(query: str) -> List[float]:
+    """
+    Get the embedding for a search query from the process-wide cache
+    
+    Args:
+        query: Search query string
+    
+    Returns:
+        Embedding vector for the query
+    """
+    return query_embedding_cache.get_or_create(query)
+
+
+def get_or_create_embeddings(queries: List[str]) -> List[List[float]]:
+    """
+    Get the embeddings for several search queries from the process-wide cache
+    
+    Args:
+        queries: Search query strings
+    
+    Returns:
+        Embedding vectors in the same order as queries
+    """
+    return query_embedding_cache.get_or_create_many(queries)
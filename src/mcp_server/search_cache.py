@@ -0,0 +1,124 @@
+"""
+In-process semantic cache of knowledge base search results
+
+Queries whose embeddings are nearly identical to a recently searched query
+(e.g. the same question rephrased) reuse its results instead of scanning the
+corpus again. The cache is emptied whenever the corpus changes.
+"""
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+# Maximum number of cached searches and the cosine similarity a query needs to
+# a cached query to reuse its results
+CACHE_MAX_SIZE = 128
+SIMILARITY_THRESHOLD = 0.97
+
+
+class SearchResultCache:
+    """Thread-safe LRU cache of search results, matched by query similarity"""
+    
+    def __init__(self, max_size: int = CACHE_MAX_SIZE, threshold: float = SIMILARITY_THRESHOLD):
+        """
+        Args:
+            max_size: Maximum number of cached searches
+            threshold: Minimum cosine similarity between a query and a cached
+                query for the cached results to be reused
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, int, List[Dict[str, Any]]]]" = OrderedDict()
+        self._matrix: Optional[Tuple[List[int], np.ndarray, np.ndarray]] = None
+        self._version: Optional[int] = None
+        self._next_key = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(query_embedding: List[float]) -> np.ndarray:
+        """Convert a query embedding to a unit-length float32 vector"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        return query / (np.linalg.norm(query) + 1e-12)
+    
+    def _sync_version(self, corpus_version: int) -> bool:
+        """
+        Drop all entries if they were cached for an older corpus version
+        
+        Returns:
+            False if corpus_version is older than the cached entries
+        """
+        if self._version is not None and corpus_version < self._version:
+            return False
+        if corpus_version != self._version:
+            self._entries.clear()
+            self._matrix = None
+            self._version = corpus_version
+        return True
+    
+    def get(self, query_embedding: List[float], top_k: int, corpus_version: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find the cached results of a search similar enough to this one
+        
+        Args:
+            query_embedding: Embedding vector for the search query
+            top_k: Number of results requested
+            corpus_version: Current corpus version (see get_corpus_version)
+        
+        Returns:
+            The cached results, or None on a miss
+        """
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            if not self._sync_version(corpus_version) or not self._entries:
+                return None
+            
+            # Stack the cached queries once per change to the entries, so a
+            # lookup is a single matrix-vector product
+            if self._matrix is None:
+                keys = list(self._entries)
+                self._matrix = (
+                    keys,
+                    np.stack([self._entries[key][0] for key in keys]),
+                    np.array([self._entries[key][1] for key in keys])
+                )
+            keys, vectors, top_ks = self._matrix
+            
+            if vectors.shape[1] != query.shape[0]:
+                return None
+            
+            scores = vectors @ query
+            scores[top_ks != top_k] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            
+            self._entries.move_to_end(keys[best])
+            return list(self._entries[keys[best]][2])
+    
+    def put(self, query_embedding: List[float], top_k: int, corpus_version: int, results: List[Dict[str, Any]]) -> None:
+        """
+        Cache the results of a search
+        
+        Args:
+            query_embedding: Embedding vector for the search query
+            top_k: Number of results requested
+            corpus_version: Corpus version the search was run against
+            results: Search results to cache
+        """
+        query = self._normalize(query_embedding)
+        
+        with self._lock:
+            # Results of a search that raced with a corpus change are stale
+            if not self._sync_version(corpus_version):
+                return
+            
+            self._entries[self._next_key] = (query, top_k, list(results))
+            self._next_key += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+
+search_result_cache = SearchResultCache()
@@ -4,21 +4,91 @@ Business logic for RAG mcp_server operations
 import json
 import logging
 import traceback
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.database.database import get_session
 from src.database.operations import (
-    get_active_chunks_with_documents,
+    get_corpus_version,
+    get_chunks_with_documents_by_ids,
     get_all_documents,
     toggle_document_active,
     delete_document
 )
-from src.database.mock_vector_engine import vector_search
-from src.document_processing.embeddings import create_embedding
+from src.database.mock_vector_engine import get_corpus, build_result
+from src.mcp_server.embedding_cache import get_or_create_embedding, get_or_create_embeddings
+from src.mcp_server.search_cache import search_result_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _rank_chunks(session, query_embedding: List[float], top_k: int, document_ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """
+    Rank the cached corpus against a query and load the winning chunks
+    
+    Only the top_k chunks have their content and document metadata fetched.
+    
+    Args:
+        session: Database session
+        query_embedding: Embedding vector for the search query
+        top_k: Number of top results to return
+        document_ids: Optional list of document IDs to restrict the search to
+        
+    Returns:
+        List of matching chunks with metadata and similarity scores
+    """
+    top_matches = get_corpus(session).search(query_embedding, top_k, document_ids)
+    chunks_by_id = get_chunks_with_documents_by_ids(session, [chunk_id for chunk_id, _ in top_matches])
+    return [build_result(chunks_by_id[chunk_id], similarity) for chunk_id, similarity in top_matches]
+
+
+def _search_active_chunks(session, query_embedding: List[float], top_k: int) -> Tuple[bool, str, List[Dict[str, Any]]]:
+    """
+    Search all active documents with an already created query embedding
+    
+    Args:
+        session: Database session
+        query_embedding: Embedding vector for the search query
+        top_k: Number of top results to return
+        
+    Returns:
+        Tuple of (success, message, results), as for search_knowledge_base
+    """
+    # Reuse the results of a near-identical recent query, if any
+    corpus_version = get_corpus_version()
+    cached_results = search_result_cache.get(query_embedding, top_k, corpus_version)
+    if cached_results is not None:
+        logger.info(f"Returning {len(cached_results)} cached result(s) of a similar query")
+        return True, f"Found {len(cached_results)} relevant document(s)", cached_results
+    
+    # Search database (only active documents)
+    try:
+        chunk_count = get_corpus(session).count()
+        
+        if not chunk_count:
+            logger.warning("No active documents found in database")
+            return True, "No active documents found in the knowledge base. Please activate some sources in the upload interface.", []
+        
+        logger.info(f"Searching {chunk_count} chunks from active documents")
+        
+        # Perform vector search
+        top_results = _rank_chunks(session, query_embedding, top_k)
+        
+        if not top_results:
+            error_msg = "All documents had incompatible embeddings. Database may contain mixed embedding dimensions."
+            logger.error(error_msg)
+            return False, error_msg, []
+        
+        logger.info(f"Returning top {len(top_results)} results with similarities: {[r['similarity'] for r in top_results]}")
+        
+        search_result_cache.put(query_embedding, top_k, corpus_version, top_results)
+        return True, f"Found {len(top_results)} relevant document(s)", top_results
+        
+    except Exception as e:
+        logger.error(f"Error in search_knowledge_base: {str(e)}")
+        logger.error(traceback.format_exc())
+        return False, f"Error during search: {str(e)}", []
+
+
 def search_knowledge_base(query: str, top_k: int = 3) -> Tuple[bool, str, List[Dict[str, Any]]]:
     """
     Search the knowledge base using vector similarity
@@ -41,39 +111,53 @@ def search_knowledge_base(query: str, top_k: int = 3) -> Tuple[bool, str, List[D
     
     # Generate embedding for query
     try:
-        query_embedding = create_embedding(query)
+        query_embedding = get_or_create_embedding(query)
         logger.info(f"Generated query embedding with dimension: {len(query_embedding)}")
     except Exception as e:
         logger.error(f"Failed to create OpenAI embedding: {str(e)}")
         return False, f"Error creating embedding: {str(e)}", []
     
-    # Search database (only active documents)
+    with get_session() as session:
+        return _search_active_chunks(session, query_embedding, top_k)
+
+
+def search_knowledge_base_batch(queries: List[str], top_k: int = 3) -> List[Tuple[bool, str, List[Dict[str, Any]]]]:
+    """
+    Search the knowledge base for several queries at once
+    
+    All queries are embedded together (with a single API request for those
+    not already cached) and then ranked one by one.
+    
+    Args:
+        queries: Search query strings
+        top_k: Number of top results to return per query
+        
+    Returns:
+        One (success, message, results) tuple per query, in the same order
+        as queries (see search_knowledge_base)
+    """
+    outcomes = [(False, "Query cannot be empty", [])] * len(queries)
+    non_empty = [i for i, query in enumerate(queries) if query]
+    if not non_empty:
+        return outcomes
+    
+    logger.info(f"Searching knowledge base for {len(non_empty)} queries (top_k={top_k})")
+    
+    # Generate embeddings for all queries
     try:
-        with get_session() as session:
-            chunks_data = get_active_chunks_with_documents(session)
-            
-            if not chunks_data:
-                logger.warning("No active documents found in database")
-                return True, "No active documents found in the knowledge base. Please activate some sources in the upload interface.", []
-            
-            logger.info(f"Retrieved {len(chunks_data)} chunks from active documents")
-            
-            # Perform vector search
-            top_results = vector_search(query_embedding, chunks_data, top_k)
-            
-            if not top_results:
-                error_msg = "All documents had incompatible embeddings. Database may contain mixed embedding dimensions."
-                logger.error(error_msg)
-                return False, error_msg, []
-            
-            logger.info(f"Returning top {len(top_results)} results with similarities: {[r['similarity'] for r in top_results]}")
-            
-            return True, f"Found {len(top_results)} relevant document(s)", top_results
-            
+        query_embeddings = get_or_create_embeddings([queries[i] for i in non_empty])
     except Exception as e:
-        logger.error(f"Error in search_knowledge_base: {str(e)}")
-        logger.error(traceback.format_exc())
-        return False, f"Error during search: {str(e)}", []
+        logger.error(f"Failed to create OpenAI embeddings: {str(e)}")
+        for i in non_empty:
+            outcomes[i] = (False, f"Error creating embedding: {str(e)}", [])
+        return outcomes
+    
+    # Rank every query within one session
+    with get_session() as session:
+        for i, query_embedding in zip(non_empty, query_embeddings):
+            outcomes[i] = _search_active_chunks(session, query_embedding, top_k)
+    
+    return outcomes
 
 
 def list_all_sources() -> Tuple[bool, str, List[Dict[str, Any]]]:
@@ -244,7 +328,7 @@ def search_specific_documents(
     
     # Generate embedding for query
     try:
-        query_embedding = create_embedding(query)
+        query_embedding = get_or_create_embedding(query)
         logger.info(f"Generated query embedding with dimension: {len(query_embedding)}")
     except Exception as e:
         logger.error(f"Failed to create OpenAI embedding: {str(e)}")
@@ -253,22 +337,16 @@ def search_specific_documents(
     # Search database (only specified documents, and only if active)
     try:
         with get_session() as session:
-            chunks_data = get_active_chunks_with_documents(session)
-            
-            # Filter by document IDs
-            filtered_chunks = [
-                chunk for chunk in chunks_data 
-                if chunk["document_id"] in document_ids
-            ]
+            chunk_count = get_corpus(session).count(document_ids)
             
-            if not filtered_chunks:
+            if not chunk_count:
                 logger.warning(f"No active chunks found for document IDs: {document_ids}")
                 return True, f"No active chunks found for the specified documents (IDs: {document_ids}). Make sure the documents exist and are active.", []
             
-            logger.info(f"Retrieved {len(filtered_chunks)} chunks from {len(document_ids)} specified document(s)")
+            logger.info(f"Searching {chunk_count} chunks from {len(document_ids)} specified document(s)")
             
             # Perform vector search
-            top_results = vector_search(query_embedding, filtered_chunks, top_k)
+            top_results = _rank_chunks(session, query_embedding, top_k, document_ids)
             
             if not top_results:
                 error_msg = "All documents had incompatible embeddings. Database may contain mixed embedding dimensions."
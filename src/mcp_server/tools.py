@@ -1,12 +1,17 @@
 """
 MCP Tools - Definitions and handlers for Model Context Protocol tools
 """
-import json
+import asyncio
+import orjson
 from typing import List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from src.mcp_server import services
 
+# OpenAI rejects embedding requests with more inputs than this, and a batch
+# search embeds all of its queries in one request
+MAX_BATCH_QUERIES = 2048
+
 
 # Pydantic models for MCP protocol
 class Tool(BaseModel):
@@ -25,6 +30,15 @@ class ToolCallResponse(BaseModel):
     isError: bool = False
 
 
+class SearchBatchRequest(BaseModel):
+    queries: List[str] = Field(max_length=MAX_BATCH_QUERIES)
+    top_k: int = 3
+
+
+class SearchBatchResponse(BaseModel):
+    results: List[ToolCallResponse]
+
+
 # Tool definitions
 TOOLS = [
     Tool(
@@ -83,12 +97,12 @@ TOOLS = [
     )
 ]
 
+# The tool list never changes, so /mcp/tools serves these pre-serialized bytes
+TOOLS_JSON = orjson.dumps({"tools": [tool.model_dump() for tool in TOOLS]})
 
-# Tool handlers
-async def handle_search_knowledge_base(query: str, top_k: int = 3) -> ToolCallResponse:
-    """Handle search knowledge base tool call - delegates to service layer"""
-    success, message, results = services.search_knowledge_base(query, top_k)
-    
+
+def _search_response(success: bool, message: str, results: List[Dict[str, Any]]) -> ToolCallResponse:
+    """Format the outcome of a knowledge base search as a tool call response"""
     if not success:
         return ToolCallResponse(
             content=[{"type": "text", "text": f"Error: {message}"}],
@@ -103,15 +117,18 @@ async def handle_search_knowledge_base(query: str, top_k: int = 3) -> ToolCallRe
         )
     
     # Format response with structured data
-    response_text = f"{message}:\n\n"
+    parts = [f"{message}:\n\n"]
     for i, result in enumerate(results, 1):
-        response_text += f"{i}. [{result['metadata'].get('title', 'Untitled')}]\n"
-        response_text += f"   Relevance: {result['similarity']:.2%}\n"
-        response_text += f"   {result['content']}\n\n"
+        parts.append(
+            f"{i}. [{result['metadata'].get('title', 'Untitled')}]\n"
+            f"   Relevance: {result['similarity']:.2%}\n"
+            f"   {result['content']}\n\n"
+        )
     
     # Add structured data as JSON for the client to parse
-    response_text += "\n---SOURCES_JSON---\n"
-    response_text += json.dumps(results, indent=2)
+    parts.append("\n---SOURCES_JSON---\n")
+    parts.append(orjson.dumps(results).decode())
+    response_text = "".join(parts)
     
     return ToolCallResponse(
         content=[{"type": "text", "text": response_text}],
@@ -119,9 +136,22 @@ async def handle_search_knowledge_base(query: str, top_k: int = 3) -> ToolCallRe
     )
 
 
+# Tool handlers
+async def handle_search_knowledge_base(query: str, top_k: int = 3) -> ToolCallResponse:
+    """Handle search knowledge base tool call - delegates to service layer"""
+    success, message, results = await asyncio.to_thread(services.search_knowledge_base, query, top_k)
+    return _search_response(success, message, results)
+
+
+async def handle_search_knowledge_base_batch(queries: List[str], top_k: int = 3) -> SearchBatchResponse:
+    """Handle a batch of search knowledge base calls - delegates to service layer"""
+    outcomes = await asyncio.to_thread(services.search_knowledge_base_batch, queries, top_k)
+    return SearchBatchResponse(results=[_search_response(*outcome) for outcome in outcomes])
+
+
 async def handle_get_available_sources() -> ToolCallResponse:
     """Handle get available sources tool call - delegates to service layer"""
-    success, message, sources = services.get_available_sources()
+    success, message, sources = await asyncio.to_thread(services.get_available_sources)
     
     if not success:
         return ToolCallResponse(
@@ -137,9 +167,11 @@ async def handle_get_available_sources() -> ToolCallResponse:
         )
     
     # Return brief message with JSON data for LLM to parse
-    response_text = f"Retrieved {len(sources)} document(s) from the knowledge base.\n\n"
-    response_text += "---SOURCES_JSON---\n"
-    response_text += json.dumps(sources, indent=2)
+    response_text = "".join([
+        f"Retrieved {len(sources)} document(s) from the knowledge base.\n\n",
+        "---SOURCES_JSON---\n",
+        orjson.dumps(sources).decode()
+    ])
     
     return ToolCallResponse(
         content=[{"type": "text", "text": response_text}],
@@ -153,7 +185,7 @@ async def handle_search_specific_documents(
     top_k: int = 3
 ) -> ToolCallResponse:
     """Handle search specific documents tool call - delegates to service layer"""
-    success, message, results = services.search_specific_documents(query, document_ids, top_k)
+    success, message, results = await asyncio.to_thread(services.search_specific_documents, query, document_ids, top_k)
     
     if not success:
         return ToolCallResponse(
@@ -169,16 +201,19 @@ async def handle_search_specific_documents(
         )
     
     # Format response with structured data
-    response_text = f"{message}:\n\n"
+    parts = [f"{message}:\n\n"]
     for i, result in enumerate(results, 1):
-        response_text += f"{i}. [{result['metadata'].get('title', 'Untitled')}]\n"
-        response_text += f"   Document ID: {result['metadata'].get('document_id')}\n"
-        response_text += f"   Relevance: {result['similarity']:.2%}\n"
-        response_text += f"   {result['content']}\n\n"
+        parts.append(
+            f"{i}. [{result['metadata'].get('title', 'Untitled')}]\n"
+            f"   Document ID: {result['metadata'].get('document_id')}\n"
+            f"   Relevance: {result['similarity']:.2%}\n"
+            f"   {result['content']}\n\n"
+        )
     
     # Add structured data as JSON for the client to parse
-    response_text += "\n---SOURCES_JSON---\n"
-    response_text += json.dumps(results, indent=2)
+    parts.append("\n---SOURCES_JSON---\n")
+    parts.append(orjson.dumps(results).decode())
+    response_text = "".join(parts)
     
     return ToolCallResponse(
         content=[{"type": "text", "text": response_text}],
@@ -0,0 +1,111 @@
+"""
+Background processing of uploaded documents
+
+Uploads are processed by a small in-process worker pool so the upload request
+can return immediately with a job ID; clients poll the job for its result.
+"""
+import logging
+import os
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional
+
+from src.document_processing.processor import process_document
+
+logger = logging.getLogger(__name__)
+
+# Number of documents processed at the same time
+UPLOAD_WORKERS = 2
+
+# Number of jobs kept for status queries; the oldest are forgotten first
+MAX_TRACKED_JOBS = 100
+
+_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="upload")
+_jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def run_upload(tmp_file_path: str, file_type: str, **kwargs) -> Dict[str, Any]:
+    """
+    Process an uploaded document saved to a temporary file, then delete the file
+    
+    Args:
+        tmp_file_path: Path to the temporary copy of the upload
+        file_type: Display name of the file type ('PDF', 'EPUB' or 'TXT')
+        **kwargs: Arguments for process_document (source_name, description, ...)
+    
+    Returns:
+        The process_document summary
+    """
+    try:
+        result = process_document(file_path=tmp_file_path, **kwargs)
+    finally:
+        os.unlink(tmp_file_path)
+        logger.info(f"Cleaned up temporary file: {tmp_file_path}")
+    
+    if result.get("success"):
+        logger.info(f"Successfully processed {file_type}: {result.get('total_chunks')} chunks created")
+    else:
+        logger.error(f"{file_type} processing failed: {result.get('error', '')}")
+    
+    return result
+
+
+def _run_job(job_id: str, tmp_file_path: str, file_type: str, kwargs: Dict[str, Any]) -> None:
+    """Run an upload job and record its outcome"""
+    _update_job(job_id, status="processing")
+    try:
+        result = run_upload(tmp_file_path, file_type, **kwargs)
+    except Exception as e:
+        logger.error(f"Error in upload job {job_id}: {str(e)}")
+        logger.error(traceback.format_exc())
+        result = {"success": False, "error": f"Server error: {str(e)}"}
+    _update_job(job_id, status="completed" if result.get("success") else "failed", result=result)
+
+
+def _update_job(job_id: str, **fields) -> None:
+    with _jobs_lock:
+        if job_id in _jobs:
+            _jobs[job_id].update(fields)
+
+
+def submit_upload(tmp_file_path: str, file_type: str, **kwargs) -> str:
+    """
+    Queue an uploaded document for background processing
+    
+    Args:
+        tmp_file_path: Path to the temporary copy of the upload (deleted when done)
+        file_type: Display name of the file type ('PDF', 'EPUB' or 'TXT')
+        **kwargs: Arguments for process_document (source_name, description, ...)
+    
+    Returns:
+        The job ID
+    """
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        _jobs[job_id] = {"job_id": job_id, "status": "queued", "result": None}
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+    
+    _executor.submit(_run_job, job_id, tmp_file_path, file_type, kwargs)
+    return job_id
+
+
+def get_upload_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the status of an upload job
+    
+    Args:
+        job_id: ID returned by submit_upload
+    
+    Returns:
+        Dictionary with job_id, status ('queued', 'processing', 'completed' or
+        'failed') and result (the process_document summary once finished), or
+        None if the job is unknown
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None